@@ -1,5 +1,8 @@
 from abc import ABC, abstractmethod
-from collections.abc import Callable, Collection, Iterator, Reversible
+from bisect import bisect_left, bisect_right
+from collections.abc import Callable, Collection, Iterable, Iterator, Reversible
+from itertools import compress
+from operator import itemgetter, not_
 from typing import Protocol, TypeVar, override
 
 from orderbitfield import OrderBitField
@@ -12,6 +15,10 @@ class SelfComparable(Protocol):
     def __lt__(self: "CV", other: "CV", /) -> bool: ...
 CV = TypeVar("CV", bound=SelfComparable)
 
+# from that many elements, removing them from the sorted index
+# in a single pass is faster than one by one
+_BATCH_UNLINK_MIN = 256
+
 class ReorderableContainer[T](Collection[T], Reversible[T], ABC):
     __slots__ = ()
 
@@ -84,6 +91,100 @@ class MappingBasedReorderableContainer[T](ReorderableContainer[T]):
 
     def __init__(self, *elements: T) -> None:
         self._store = dict(zip(elements, OrderBitField.initial(len(elements))))
+        # the elements and their codes, kept sorted in parallel
+        # so that reading the order never requires sorting
+        if len(self._store) == len(elements):
+            # the initial codes are already in order
+            self._elements = list(self._store)
+            self._codes = list(self._store.values())
+        else:
+            # with repeated elements, the last code of each is kept,
+            # so the store is no longer in code order
+            items = sorted(self._store.items(), key=itemgetter(1))
+            self._elements = list(map(itemgetter(0), items))
+            self._codes = list(map(itemgetter(1), items))
+        # immutable snapshot of self._elements, shared between iterations
+        # until the next change of order
+        self._snapshot: tuple[T, ...]|None = None
+
+    def _ordered(self) -> tuple[T, ...]:
+        if self._snapshot is None:
+            self._snapshot = tuple(self._elements)
+        return self._snapshot
+
+    def _unindex(self, element: T) -> T:
+        """
+        Remove the element from the sorted index, leaving it in the store.
+        Returns the element as it is stored.
+        Raises KeyError if the element is not present.
+        """
+        code = self._store[element]
+        i = bisect_left(self._codes, code)
+        # match the element the way the store does, by identity first
+        while self._elements[i] is not element and self._elements[i] != element:
+            i += 1
+        self._snapshot = None
+        del self._codes[i]
+        return self._elements.pop(i)
+
+    def _unindex_many(self, elements: Collection[T]) -> list[T]:
+        """
+        Remove the elements from the sorted index, leaving them in the store.
+        Returns the elements as they are stored.
+        The elements must be present and distinct.
+        """
+        if len(elements) < _BATCH_UNLINK_MIN:
+            return list(map(self._unindex, elements))
+
+        self._snapshot = None
+        removed = set(elements)
+        found = list(map(removed.__contains__, self._elements))
+        stored = list(compress(self._elements, found))
+        keep = list(map(not_, found))
+        self._elements = list(compress(self._elements, keep))
+        self._codes = list(compress(self._codes, keep))
+        return stored
+
+    def _unlink_many(self, elements: Collection[T]) -> None:
+        """
+        Remove the elements from the store and from the sorted index.
+        The elements must be present and distinct.
+        """
+        self._unindex_many(elements)
+        for element in elements:
+            del self._store[element]
+
+    def _link(self, elements: Iterable[T], codes: Iterable[OrderBitField]) -> None:
+        """
+        Set the codes of the elements, moving them if they are already present.
+        The codes must be in order.
+        """
+        elements = tuple(elements)
+        codes = list(codes)
+        if not elements:
+            return
+        distinct = dict.fromkeys(elements)
+        moved = self._unindex_many([element for element in distinct if element in self._store])
+        if moved:
+            # the moved elements keep the key object already in the store
+            stored = {element: element for element in moved}
+            elements = tuple(stored.get(element, element) for element in elements)
+            distinct = dict.fromkeys(elements)
+        self._snapshot = None
+        # when an element is given more than once, its last code is kept
+        self._store.update(zip(elements, codes))
+
+        i = bisect_right(self._codes, codes[0])
+        if len(distinct) == len(elements) and (i == len(self._codes) or codes[-1] < self._codes[i]):
+            # the new codes all fit between the same two existing codes
+            self._elements[i:i] = elements
+            self._codes[i:i] = codes
+        else:
+            for element in distinct:
+                code = self._store[element]
+                i = bisect_right(self._codes, code)
+                self._elements.insert(i, element)
+                self._codes.insert(i, code)
 
     @property
     @override
@@ -96,7 +197,8 @@ class MappingBasedReorderableContainer[T](ReorderableContainer[T]):
 
     @override
     def __iter__(self) -> Iterator[T]:
-        return iter(sorted(self._store, key=self._store.__getitem__))
+        # iterate over a snapshot so that the container can be mutated meanwhile
+        return iter(self._ordered())
 
     @override
     def __len__(self) -> int:
@@ -104,63 +206,74 @@ class MappingBasedReorderableContainer[T](ReorderableContainer[T]):
 
     @override
     def __reversed__(self) -> Iterator[T]:
-        return iter(sorted(self._store, key=self._store.__getitem__, reverse=True))
+        return reversed(self._ordered())
 
     @override
     def put_between(self, start: T, end: T, *elements: T) -> None:
         if start == end:
             raise ValueError("The start and end elements are the same")
-        self._store.update(zip(elements, OrderBitField.between(len(elements), self._store[start], self._store[end])))
+        self._link(elements, OrderBitField.between(len(elements), self._store[start], self._store[end]))
 
     @override
     def put_to_end(self, *elements: T, last=True) -> None:
         if not self._store:
             codes = OrderBitField.initial(len(elements))
         elif last:
-            codes = OrderBitField.after(len(elements), max(self._store.values()))
+            codes = OrderBitField.after(len(elements), self._codes[-1])
         else:
-            codes = OrderBitField.before(len(elements), min(self._store.values()))
-        self._store.update(zip(elements, codes))
+            codes = OrderBitField.before(len(elements), self._codes[0])
+        self._link(elements, codes)
 
     @override
     def put_next_to(self, next_to: T, *elements: T, after=True) -> None:
         nto = self._store[next_to]
         if after:
-            end = min(filter(lambda o: o > nto, self._store.values()), default=None)
-            if end is None:
+            i = bisect_right(self._codes, nto)
+            if i == len(self._codes):
                 codes = OrderBitField.after(len(elements), nto)
             else:
-                codes = OrderBitField.between(len(elements), nto, end)
+                codes = OrderBitField.between(len(elements), nto, self._codes[i])
         else:
-            start = max(filter(lambda o: o < nto, self._store.values()), default=None)
-            if start is None:
+            i = bisect_left(self._codes, nto)
+            if i == 0:
                 codes = OrderBitField.before(len(elements), nto)
             else:
-                codes = OrderBitField.between(len(elements), start, nto)
-        self._store.update(zip(elements, codes))
+                codes = OrderBitField.between(len(elements), self._codes[i-1], nto)
+        self._link(elements, codes)
 
     @override
     def recompute(self) -> None:
-        self._store = dict(zip(self, OrderBitField.initial(len(self))))
+        self._codes = list(OrderBitField.initial(len(self._elements)))
+        self._store = dict(zip(self._elements, self._codes))
 
     @override
     def popitem(self, *, last=True) -> T:
+        if not self._elements:
+            raise ValueError("popitem(): container is empty")
         if last:
-            element = max(self._store, key=self._store.__getitem__)
+            element = self._elements.pop()
+            self._codes.pop()
         else:
-            element = min(self._store, key=self._store.__getitem__)
+            element = self._elements.pop(0)
+            self._codes.pop(0)
         del self._store[element]
+        self._snapshot = None
         return element
 
     @override
     def remove(self, *elements: T) -> None:
+        # check every element before removing any
+        distinct: set[T] = set()
         for element in elements:
-            del self._store[element]
+            # an element given twice is absent the second time
+            if element in distinct or element not in self._store:
+                raise KeyError(element)
+            distinct.add(element)
+        self._unlink_many(distinct)
 
     @override
     def discard(self, *elements: T) -> None:
-        for element in elements:
-            self._store.pop(element, None)
+        self._unlink_many({element for element in elements if element in self._store})
 
     @override
     def sort_key(self) -> Callable[[T], SelfComparable]:
@@ -1,219 +1,285 @@
-from collections import Counter, defaultdict
-from collections.abc import Collection, Iterable, Mapping
-from math import ceil
-import types
+from collections.abc import Collection, Sequence
+from functools import lru_cache
+from itertools import zip_longest
 
 
-_EMPTYMAP = types.MappingProxyType({})
 _TOP_VALUE = 256
 _MAX_BYTE = _TOP_VALUE - 1
 _MAGIC_MIDDLE = _TOP_VALUE // 2
-_BYTES_MAGIC_MIDDLE = bytes((_MAGIC_MIDDLE,))
-BYTES_ZERO = bytes((0,))
+# the one-byte bytes objects, indexed by their value
+_SINGLE_BYTES = tuple(bytes((i,)) for i in range(_TOP_VALUE))
+# the same, followed by the magic middle byte
+_SINGLE_BYTES_MIDDLE = tuple(bytes((i, _MAGIC_MIDDLE)) for i in range(_TOP_VALUE))
+_BYTES_MAX = _SINGLE_BYTES[_MAX_BYTE]
+BYTES_ZERO = _SINGLE_BYTES[0]
+BYTES_MAGIC_MIDDLE = _SINGLE_BYTES[_MAGIC_MIDDLE]
 
 type byte = int
 
+def mismatch(s1: bytes, s2: bytes) -> int:
+    """
+    Returns the index of the first byte differing between s1 and s2,
+    or the length of the shortest one if it is a prefix of the other.
+    """
+    n = min(len(s1), len(s2))
+    # compares all the bytes at once, the highest set bit being in the first differing byte
+    diff = int.from_bytes(s1[:n]) ^ int.from_bytes(s2[:n])
+    return n - (diff.bit_length() + 7)//8
+
 def common_prefix(s1: bytes, s2: bytes) -> bytes:
     """
     Requires s1 and s2 to be ordered, in that order.
     """
-    for i, c in enumerate(s1):
-        if c != s2[i]:
-            return s1[:i]
-    return s1
+    return s1[:mismatch(s1, s2)]
 
 def generate_codes_v3(
         ncodes: int,
         code_start: bytes,
         code_end: bytes|None,
         prefixe: bytes,
-        ) -> Iterable[bytes]:
+        ) -> list[bytes]:
     """
-    The codes are yielded in order.
+    The codes are returned in order.
     """
-    if not ncodes:
-        return
+    rv: list[bytes] = []
+
+    # the recursion is unrolled as a stack of pending items,
+    # each being either a code to emit or arguments for a recursive call,
+    # the next item in order being on top
+    stack: list[bytes|tuple[int, bytes, bytes|None, bytes]] = [(ncodes, code_start, code_end, prefixe)]
+    # the items of the current call, in order, reused across iterations
+    pending: list[bytes|tuple[int, bytes, bytes|None, bytes]] = []
+    while stack:
+        item = stack.pop()
+        if isinstance(item, bytes):
+            rv.append(item)
+            continue
+
+        ncodes, code_start, code_end, prefixe = item
+        if not ncodes:
+            continue
+
+        start_digit_1 = code_start[0] if code_start else 0
+        end_digit_1 = code_end[0] if code_end else _MAX_BYTE
+
+        # there are going to be direct codes (form prefixe + x)
+        # and longer codes (form prefixe + xy)
+
+        # range of possible direct digits : [[start_digit_1 + 1, direct_max]]
+        # when the end boundary is a single digit, prefixe + end_digit_1 is the boundary itself
+        direct_max = end_digit_1 - 1 if code_end is not None and len(code_end) == 1 else end_digit_1
+        n_direct_candidates = direct_max - (start_digit_1 + 1) + 1
+        # the x digits that will be used for direct codes
+        direct: Collection[byte]
+        # the number of longer codes that will be generated for each x digit,
+        # indexed by the digit minus start_digit_1
+        longer: Sequence[int]
+
+        if n_direct_candidates >= ncodes:
+            # everything can go in direct codes
+
+            if n_direct_candidates == ncodes:
+                # no need to arrange
+                direct = range(start_digit_1 + 1, direct_max + 1)
+            else:
+                direct = _simple_distribute_indices(ncodes, start_digit_1+1, direct_max)
 
-    start_digit_1 = code_start[0] if code_start else 0
-    end_digit_1 = code_end[0] if code_end else _MAX_BYTE
+            longer = ()
 
-    # there are going to be direct codes (form prefixe + x)
-    # and longer codes (form prefixe + xy)
+        else:
+            # there are too many codes to be generated for direct codes to suffice
+            # we take all available direct codes
+            direct = range(start_digit_1 + 1, direct_max + 1)
+
+            # distributing longer codes among the digits by which they will begin
+            # interval those starting digits : [[start_digit_1, end_digit_1]]
+            # indexed by the digit minus start_digit_1
+            longer_ponderation = [1.] * (end_digit_1 - start_digit_1 + 1)
+
+            # if we have a starting boundary and it has a second digit,
+            # the first digit's ponderation is the distance
+            # between that second digit (excluded) and _TOP_VALUE (included)
+            if len(code_start) > 1:
+                longer_ponderation[0] = (_TOP_VALUE - code_start[1]) / _TOP_VALUE
+            # otherwise that digit has no particular ponderation
+            # in any case, start_digit_1 is valid as a start for longer codes
+
+            longer_max_boundary: byte # inclusive
+            if code_end:
+                # if there is an end boundary,
+                if len(code_end) > 1:
+                    # if it has a second digit,
+                    # the first digit's ponderation is the distance
+                    # between 0 (included) and that second digit (excluded)
+                    longer_ponderation[end_digit_1 - start_digit_1] = (code_end[1] - 0) / _TOP_VALUE
+                    longer_max_boundary = end_digit_1
+                else:
+                    longer_max_boundary = end_digit_1 - 1
+            else:
+                longer_max_boundary = end_digit_1
 
-    # range of possible direct digits : [[start_digit_1 + 1, end_digit_1]]
-    n_direct_candidates = end_digit_1 - (start_digit_1 + 1) + 1
-    # the x digits that will be used for direct codes
-    direct: Collection[byte]
-    # the number of longer codes that will be generated for each x digit
-    longer: Mapping[byte, int]
+            longer = _ponderated_distribute_indices(
+                ncodes - n_direct_candidates,
+                start_digit_1, longer_max_boundary,
+                longer_ponderation)
 
-    if n_direct_candidates >= ncodes:
-        # everything can go in direct codes
+        assert sum(longer) + len(direct) == ncodes
 
-        if n_direct_candidates == ncodes:
-            # no need to arrange
-            direct = range(start_digit_1 + 1, end_digit_1 + 1)
-        else:
-            direct = frozenset(_simple_distribute_indices(ncodes, start_digit_1+1, end_digit_1))
-
-        longer = _EMPTYMAP
-
-    else:
-        # there are too many codes to be generated for direct codes to suffice
-        # we take all available direct codes
-        direct = range(start_digit_1 + 1, end_digit_1 + 1)
-
-        # distributing longer codes among the digits by which they will begin
-        # interval those starting digits : [[start_digit_1, end_digit_1]]
-        longer_ponderation = defaultdict[int, float](lambda: 1)
-
-        # if we have a starting boundary and it has a second digit,
-        # the first digit's ponderation is the distance
-        # between that second digit (excluded) and _TOP_VALUE (included)
-        if len(code_start) > 1:
-            longer_ponderation[start_digit_1] = (_TOP_VALUE - code_start[1]) / _TOP_VALUE
-        # otherwise that digit has no particular ponderation
-        # in any case, start_digit_1 is valid as a start for longer codes
-
-        longer_max_boundary: byte # inclusive
-        if code_end:
-            # if there is an end boundary,
-            if len(code_end) > 1:
-                # if it has a second digit,
-                # the first digit's ponderation is the distance
-                # between 0 (included) and that second digit (excluded)
-                longer_ponderation[end_digit_1] = (code_end[1] - 0) / _TOP_VALUE
-                longer_max_boundary = end_digit_1
-            else:
-                longer_max_boundary = end_digit_1 - 1
-        else:
-            longer_max_boundary = end_digit_1
+        if not longer:
+            # the direct digits are in order and there is nothing to recurse into,
+            # so the codes are the next ones and the unused digits can be skipped
+            rv.extend(prefixe + _SINGLE_BYTES[c] for c in direct)
+            continue
 
-        longer = _ponderated_distribute_indices(
-            ncodes - n_direct_candidates,
-            start_digit_1, longer_max_boundary,
-            longer_ponderation)
+        for c, nrecurs in zip_longest(range(start_digit_1, end_digit_1 + 1), longer, fillvalue=0):
+            pre = prefixe + _SINGLE_BYTES[c]
 
-    assert sum(longer.values()) + len(direct) == ncodes
+            if c in direct:
+                pending.append(pre)
 
-    for c in range(start_digit_1, end_digit_1 + 1):
-        pre = prefixe + bytes((c,))
+            if nrecurs:
+                pending.append((
+                    nrecurs,
+                    code_start[1:] if code_start and c == start_digit_1 else b"",
+                    code_end[1:] if code_end and c == end_digit_1 else None,
+                    pre))
 
-        if c in direct:
-            yield pre
+        stack.extend(reversed(pending))
+        pending.clear()
 
-        nrecurs = longer.get(c, 0)
-        if nrecurs:
-            yield from generate_codes_v3(
-                nrecurs,
-                code_start[1:] if code_start and c == start_digit_1 else b"",
-                code_end[1:] if code_end and c == end_digit_1 else None,
-                pre)
+    return rv
 
 generate_codes = generate_codes_v3
 
 def _ponderated_distribute_indices(
         ncodes: int,
         mn: byte, mx: byte,
-        ponderation: Mapping[byte, float],
-        ) -> Mapping[byte, int]:
+        ponderation: Sequence[float],
+        ) -> list[int]:
     """
     Spreads ncodes among the mn to mx digits inclusive,
     with a ponderation for each index.
+    The ponderation of digit c is ponderation[c - mn],
+    and the number of codes attributed to it is at the same index in the returned list.
     """
     assert 0 <= mn
-    assert mn < mx
+    assert mn <= mx
     assert mx < _TOP_VALUE
 
     nchars = mx - mn + 1
-    attrib = Counter()
+    attrib = [0] * nchars
     restant = ncodes
 
     if ncodes > nchars:
-        total = sum(ponderation[c] for c in range(mn, mx + 1))
-        for c in range(mn, mx + 1):
-            val = int(ncodes * ponderation[c] / total)
-            attrib[c] = val
+        total = sum(ponderation[i] for i in range(nchars))
+        for i in range(nchars):
+            val = int(ncodes * ponderation[i] / total)
+            attrib[i] = val
             restant -= val
 
     for c in _simple_distribute_indices(restant, mn, mx):
-        attrib[c] += 1
+        attrib[c - mn] += 1
 
     return attrib
 
-def _simple_distribute_indices(ncodes: int, mn: byte, mx: byte) -> Iterable[byte]:
+@lru_cache(maxsize=4096)
+def _simple_distribute_indices(ncodes: int, mn: byte, mx: byte) -> tuple[byte, ...]:
     """
     Spreads ncodes among the mn to mx digits inclusive.
     ncodes must be positive and lower or equal to the number of available digits.
+    The digits are returned in order.
 
     If there are 2 codes to spread, they are attributed on a thirds basis
     Otherwise, one code is placed at the middle digit rounded down, and the others
     are spread recursively among the remaining digits.
+
+    The result only depends on the three integers, so it is cached.
     """
-    if ncodes <= 0:
-        return ()
+    rv: list[byte] = []
 
-    nchars = mx - mn + 1
+    # the recursion is unrolled as a stack of (ncodes, mn, mx) ranges,
+    # the leftmost range being on top so that digits come out in order
+    stack = [(ncodes, mn, mx)]
+    while stack:
+        ncodes, mn, mx = stack.pop()
+        if ncodes <= 0:
+            continue
+
+        nchars = mx - mn + 1
+
+        assert ncodes <= nchars
 
-    assert ncodes <= nchars
+        if ncodes == 2:
+            rv.append(mn + (nchars - 1)//3)
+            rv.append(mn + (2*nchars - 1)//3)
+            continue
 
-    if ncodes == 2:
-        yield mn + (nchars - 1)//3
-        yield mn + (2*nchars - 1)//3
-        return
+        # midpoint
+        pivot = mn + nchars//2
 
-    # midpoint
-    pivot = mn + nchars//2
+        if ncodes == 1:
+            rv.append(pivot)
+        else:
+            # numbers of code to put on the right
+            # (must be lower or equal to those on the left because of how the pivot is computed,
+            # which favors the fact that appending is more frequent than prepending,
+            # so if we must choose best leave more room after rather than before)
+            right = (ncodes-1) // 2
 
-    if ncodes == 1:
-        yield pivot
-    else:
-        # numbers of code to put on the right
-        # (must be lower or equal to those on the left because of how the pivot is computed,
-        # which favors the fact that appending is more frequent than prepending,
-        # so if we must choose best leave more room after rather than before)
-        right = (ncodes-1) // 2
+            stack.append((right, pivot+1, mx))
+            stack.append((1, pivot, pivot))
+            stack.append((ncodes-1-right, mn, pivot-1))
 
-        yield from _simple_distribute_indices(ncodes-1-right, mn, pivot-1)
-        yield pivot
-        yield from _simple_distribute_indices(right, pivot+1, mx)
+    return tuple(rv)
 
 
 # Bonus functions
 
 def simple_between(start: bytes, end: bytes) -> bytes:
-    i = -1
-    for i, (a, b) in enumerate(zip(start, end)):
-        if a != b:
-            post = (a + b) // 2
-            posts = bytearray((post,))
-            if post in (a, b):
-                posts.append(_MAGIC_MIDDLE)
-            return start[:i] + posts
-
-    mx = max(start, end, key=len)
-    post = mx[i+1] // 2
-    posts = bytearray((post,))
+    i = mismatch(start, end)
+    if i < min(len(start), len(end)):
+        a = start[i]
+        b = end[i]
+        post = (a + b) // 2
+        if post in (a, b):
+            return start[:i] + _SINGLE_BYTES_MIDDLE[post]
+        return start[:i] + _SINGLE_BYTES[post]
+
+    # one is a prefix of the other
+    mx = start if len(start) >= len(end) else end
+    post = mx[i] // 2
+    if post == 0:
+        return start[:i] + _SINGLE_BYTES_MIDDLE[post]
+    return start[:i] + _SINGLE_BYTES[post]
+
+def _before_tail(b: byte) -> bytes:
+    post = b // 2
     if post == 0:
-        posts.append(_MAGIC_MIDDLE)
-    return start[:i] + posts
+        return _SINGLE_BYTES_MIDDLE[post]
+    return _SINGLE_BYTES[post]
+
+def _after_tail(b: byte) -> bytes:
+    # b + ceil((_MAX_BYTE - b) / 2), in integer arithmetic
+    post = (b + _MAX_BYTE + 1) // 2
+    if post == b:
+        return _SINGLE_BYTES_MIDDLE[post]
+    return _SINGLE_BYTES[post]
+
+# the bytes replacing the first usable byte of the value, indexed by that byte
+_BEFORE_TAILS = tuple(map(_before_tail, range(_TOP_VALUE)))
+_AFTER_TAILS = tuple(map(_after_tail, range(_TOP_VALUE)))
 
 def simple_before(other: bytes) -> bytes:
-    for i, b in enumerate(other):
-        if b > 0:
-            post = b // 2
-            posts = bytearray((post,))
-            if post == 0:
-                posts.append(_MAGIC_MIDDLE)
-            return other[:i] + posts
-    raise ValueError("Cannot create a value before 0.")
+    # index of the first non-zero byte
+    i = len(other) - len(other.lstrip(BYTES_ZERO))
+    if i == len(other):
+        raise ValueError("Cannot create a value before 0.")
+    return other[:i] + _BEFORE_TAILS[other[i]]
 
 def simple_after(other: bytes) -> bytes:
-    for i, b in enumerate(other):
-        if b < _MAX_BYTE:
-            post = b + ceil((_MAX_BYTE - b) / 2)
-            posts = bytearray((post,))
-            if post == b:
-                posts.append(_MAGIC_MIDDLE)
-            return other[:i] + posts
-    return other + _BYTES_MAGIC_MIDDLE
+    # index of the first byte lower than _MAX_BYTE
+    i = len(other) - len(other.lstrip(_BYTES_MAX))
+    if i == len(other):
+        # other may be a bytes subclass overriding concatenation
+        return bytes(other) + BYTES_MAGIC_MIDDLE
+    return other[:i] + _AFTER_TAILS[other[i]]
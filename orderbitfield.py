@@ -1,18 +1,36 @@
-from collections.abc import Iterable
+from collections.abc import Iterable, Sequence
+from functools import lru_cache, partial
 import math
 from typing import ClassVar, Self
 import warnings
 
 from deps import (
-    common_prefix as _common_prefix,
     generate_codes as _generate_codes,
+    mismatch as _mismatch,
     simple_between as _simple_between,
     simple_before as _simple_before,
     simple_after as _simple_after,
     BYTES_ZERO as _BYTES_ZERO,
+    BYTES_MAGIC_MIDDLE as _BYTES_MAGIC_MIDDLE,
 )
 
 
+# the decimal representation of each byte value
+_BYTE_STR = tuple(map(str, range(256)))
+
+# above that number of codes, initial codes are not worth keeping in memory
+_INITIAL_CACHE_MAX_N = 1024
+
+@lru_cache(maxsize=256)
+def _cached_initial_codes(n: int) -> tuple[bytes, ...]:
+    return tuple(_generate_codes(n, b"", None, b""))
+
+def _initial_codes(n: int) -> Sequence[bytes]:
+    if n <= _INITIAL_CACHE_MAX_N:
+        return _cached_initial_codes(n)
+    return _generate_codes(n, b"", None, b"")
+
+
 class ZeroOrderBitFieldWarning(Warning):
     """
     Warning emitted when a value of 0 is used as an OrderBitField.
@@ -48,22 +66,51 @@ class OrderBitField(bytes):
     max_size: ClassVar[int|None] = None
 
     def __new__(cls, val):
-        val = bytes(val)
+        # instances are immutable and already validated
+        if type(val) is cls:
+            return val
 
-        if (cls.max_size is not None) and (len(val) > cls.max_size):
-            raise BoundOrderBitFieldMaxSizeException(f"Value {val!r} is too long for a BoundOrderBitField of size {cls.max_size}.")
+        if type(val) is not bytes:
+            val = bytes(val)
 
-        val = val.rstrip(_BYTES_ZERO)
+        max_size = cls.max_size
+        if (max_size is not None) and (len(val) > max_size):
+            raise BoundOrderBitFieldMaxSizeException(f"Value {val!r} is too long for a BoundOrderBitField of size {max_size}.")
+
+        if val and val[-1] == 0:
+            val = val.rstrip(_BYTES_ZERO)
         if not val:
             warnings.warn(f"Value {val!r} resolves to 0 or empty bytes, which results in an invalid OrderBitField.", ZeroOrderBitFieldWarning)
 
         return super().__new__(cls, val)
 
+    @classmethod
+    def _from_trusted(cls, val: bytes) -> Self:
+        """
+        Constructor for the values generated by the deps functions,
+        which are bytes without trailing zeros.
+        Only the size is checked, for bound subclasses.
+        """
+        max_size = cls.max_size
+        if (max_size is not None) and (len(val) > max_size):
+            raise BoundOrderBitFieldMaxSizeException(f"Value {val!r} is too long for a BoundOrderBitField of size {max_size}.")
+        return bytes.__new__(cls, val)
+
+    @classmethod
+    def _map_trusted(cls, vals: Iterable[bytes]) -> Iterable[Self]:
+        """
+        Maps _from_trusted over the values,
+        looking the size up only once for unbound classes.
+        """
+        if cls.max_size is None:
+            return map(partial(bytes.__new__, cls), vals)
+        return map(cls._from_trusted, vals)
+
     def __bytes__(self):
         return self[:]
 
     def __repr__(self):
-        return f"{self.__class__.__name__}(({', '.join(map(str, self))}))"
+        return f"{self.__class__.__name__}(({', '.join(map(_BYTE_STR.__getitem__, self))}))"
 
     @classmethod
     def between(cls, n: int, start: "OrderBitField", end: "OrderBitField") -> Iterable[Self]:
@@ -74,8 +121,15 @@ class OrderBitField(bytes):
         """
         if start == end:
             raise ValueError("The start and end fields are the same")
-        prefixe = _common_prefix(start, end)
-        return map(cls, _generate_codes(n, start[len(prefixe):], end[len(prefixe):], prefixe))
+        i = _mismatch(start, end)
+        prefixe = start[:i]
+        code_start = start[i:]
+        code_end = end[i:]
+        if n == 1 and len(code_start) == len(code_end) == 1 and code_end[0] - code_start[0] == 1:
+            # adjacent single digits, the shortest code is right in the middle after the start,
+            # which is what the generic code generation would return
+            return cls._map_trusted((prefixe + code_start + _BYTES_MAGIC_MIDDLE,))
+        return cls._map_trusted(_generate_codes(n, code_start, code_end, prefixe))
 
     @classmethod
     def initial(cls, n: int = 1) -> Iterable[Self]:
@@ -84,15 +138,15 @@ class OrderBitField(bytes):
         Returns the shortest values possible,
         and then as evenly spaced as possible.
         """
-        return map(cls, _generate_codes(n, b"", None, b""))
+        return cls._map_trusted(_initial_codes(n))
 
     @classmethod
     def before(cls, n: int, other: "OrderBitField") -> Iterable[Self]:
-        return map(cls, _generate_codes(n, b"", other, b""))
+        return cls._map_trusted(_generate_codes(n, b"", other, b""))
 
     @classmethod
     def after(cls, n: int, other: "OrderBitField") -> Iterable[Self]:
-        return map(cls, _generate_codes(n, other, None, b""))
+        return cls._map_trusted(_generate_codes(n, other, None, b""))
 
     @classmethod
     def single_before(cls, other: "OrderBitField") -> Self:
@@ -101,21 +155,21 @@ class OrderBitField(bytes):
         Returns the shortest value possible,
         and then such that it's closest to half of the given OrderBitField.
         """
-        return cls(_simple_before(other[:]))
+        return cls._from_trusted(_simple_before(other))
 
     @classmethod
     def single_after(cls, other: "OrderBitField") -> Self:
         """
         Constructor, returns a new OrderBitField that is after the given OrderBitField.
         """
-        return cls(_simple_after(other[:]))
+        return cls._from_trusted(_simple_after(other))
 
     @classmethod
     def single_between(cls, start: "OrderBitField", end: "OrderBitField") -> Self:
         """
         Constructor, returns a new OrderBitField that is between the two given OrderBitFields.
         """
-        return cls(_simple_between(start[:], end[:]))
+        return cls._from_trusted(_simple_between(start, end))
 
     def __add__(self, other) -> "OrderBitField":
         """
@@ -125,14 +179,27 @@ class OrderBitField(bytes):
         bound to the sum of the sizes.
         Otherwise, the new instance is not bound and is of type OrderBitField.
         """
-        if (self.max_size is not None) and isinstance(other, OrderBitField):
-            b = bytes.__add__(self.ljust(self.max_size, _BYTES_ZERO), other)
-            if other.max_size is not None:
-                class BoundOrderBitField(OrderBitField):
-                    __slots__ = ()
-                    max_size = self.max_size + other.max_size
-                ty = BoundOrderBitField
+        max_size = self.max_size
+        if (max_size is not None) and isinstance(other, OrderBitField):
+            b = b"".join((self, _BYTES_ZERO * (max_size - len(self)), other))
+            other_max_size = other.max_size
+            if other_max_size is not None:
+                ty = _bound_type(max_size + other_max_size)
             else:
                 ty = OrderBitField
-            return ty(b)
+            if not other:
+                # let the constructor strip the padding and warn
+                return ty(b)
+            return ty._from_trusted(b)
         return NotImplemented
+
+@lru_cache(maxsize=None)
+def _bound_type(size: int) -> type[OrderBitField]:
+    """
+    Returns the ad-hoc OrderBitField subclass bound to the given size,
+    the same class being returned for the same size.
+    """
+    class BoundOrderBitField(OrderBitField):
+        __slots__ = ()
+        max_size = size
+    return BoundOrderBitField